@@ -1,13 +1,15 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License.
 
-from copy import deepcopy
+from copy import copy, deepcopy
 from typing import List
 
+from msrest.serialization import Model
 from botframework.connector.token_api.models import TokenExchangeRequest
 from botbuilder.schema import (
     Activity,
     ActivityTypes,
+    ConversationReference,
     ExpectedReplies,
     DeliveryModes,
     SignInConstants,
@@ -28,18 +30,155 @@ from .begin_skill_dialog_options import BeginSkillDialogOptions
 from .skill_dialog_options import SkillDialogOptions
 
 
+# Enum members resolved once at import time; the per-reply loop in _send_to_skill
+# compares against these on every activity, and a module global is cheaper to load
+# than an attribute access on the enum class.
+_EOC = ActivityTypes.end_of_conversation
+_INVOKE_RESPONSE = ActivityTypes.invoke_response
+_EXPECT_REPLIES = DeliveryModes.expect_replies
+_OAUTH_CT = ContentTypes.oauth_card
+
+# turn_state key for the conversation reference extracted from the incoming activity.
+# The incoming activity is invariant for the duration of a turn, so the reference can be
+# extracted once and shared by every SkillDialog method that runs in that turn.
+_CONVERSATION_REF_CACHE_KEY = "SkillDialog.ConversationReference"
+
+
+def _get_cached_conv_ref(context: TurnContext) -> ConversationReference:
+    conv_ref = context.turn_state.get(_CONVERSATION_REF_CACHE_KEY)
+    if conv_ref is None:
+        conv_ref = TurnContext.get_conversation_reference(context.activity)
+        context.turn_state[_CONVERSATION_REF_CACHE_KEY] = conv_ref
+    return conv_ref
+
+
+def _apply_incoming_ref(activity: Activity, context: TurnContext):
+    """
+    Stamps the turn's conversation reference onto an outgoing activity, extracting the
+    reference at most once per turn via the turn_state cache.
+    """
+    TurnContext.apply_conversation_reference(
+        activity, _get_cached_conv_ref(context), is_incoming=True
+    )
+
+
+def _validate_begin_dialog_args(options: object) -> BeginSkillDialogOptions:
+    # Fast path: callers normally pass a ready-made BeginSkillDialogOptions.
+    if isinstance(options, BeginSkillDialogOptions) and options.activity is not None:
+        return options
+
+    if not options:
+        raise TypeError("options cannot be None.")
+
+    dialog_args = BeginSkillDialogOptions.from_object(options)
+
+    if not dialog_args:
+        raise TypeError(
+            "SkillDialog: options object not valid as BeginSkillDialogOptions."
+        )
+
+    if not dialog_args.activity:
+        raise TypeError(
+            "SkillDialog: activity object in options as BeginSkillDialogOptions cannot be None."
+        )
+
+    return dialog_args
+
+
+def _copy_atomic(obj):
+    return obj
+
+
+def _copy_list(obj: list) -> list:
+    return [_fast_activity_deepcopy(item) for item in obj]
+
+
+def _copy_dict(obj: dict) -> dict:
+    return {key: _fast_activity_deepcopy(value) for key, value in obj.items()}
+
+
+# Fast paths keyed on concrete type. Immutable scalars are returned as-is; containers
+# recurse without the memo bookkeeping copy.deepcopy performs (activities are trees,
+# not cyclic graphs, so a memo is not needed).
+_DEEPCOPY_DISPATCH = {
+    str: _copy_atomic,
+    int: _copy_atomic,
+    float: _copy_atomic,
+    bool: _copy_atomic,
+    bytes: _copy_atomic,
+    type(None): _copy_atomic,
+    list: _copy_list,
+    dict: _copy_dict,
+}
+
+
+def _fast_activity_deepcopy(obj):
+    """
+    Deep-copies an activity graph faster than copy.deepcopy.
+
+    Activities are composed of msrest models, dicts, lists and scalars, so a dispatch on
+    the concrete type avoids the per-node memo management and __reduce_ex__ machinery of
+    the generic implementation. Anything unrecognized falls back to copy.deepcopy.
+    """
+    handler = _DEEPCOPY_DISPATCH.get(type(obj))
+    if handler:
+        return handler(obj)
+    if isinstance(obj, Model):
+        clone = obj.__class__.__new__(obj.__class__)
+        clone.__dict__ = {
+            key: _fast_activity_deepcopy(value) for key, value in obj.__dict__.items()
+        }
+        return clone
+    return deepcopy(obj)
+
+
 class SkillDialog(Dialog):
+    # Slot-based storage for this class's own attributes gives offset-based access
+    # instead of dict lookups. Dialog itself is not slotted, so instances still carry
+    # a __dict__ for the inherited attributes.
+    __slots__ = (
+        "dialog_options",
+        "_use_deep_copy",
+        "_cid_factory_template",
+        "_post_args_prefix",
+    )
+
     SKILLCONVERSATIONIDSTATEKEY = (
         "Microsoft.Bot.Builder.Dialogs.SkillDialog.SkillConversationId"
     )
+    _DELIVER_MODE_KEY = "deliverymode"
 
-    def __init__(self, dialog_options: SkillDialogOptions, dialog_id: str):
+    def __init__(
+        self,
+        dialog_options: SkillDialogOptions,
+        dialog_id: str,
+        use_deep_copy: bool = False,
+    ):
         super().__init__(dialog_id)
         if not dialog_options:
             raise TypeError("SkillDialog.__init__(): dialog_options cannot be None.")
 
         self.dialog_options = dialog_options
-        self._deliver_mode_state_key = "deliverymode"
+        self._use_deep_copy = use_deep_copy
+        # The bot id and skill never change for the life of the dialog, so cache them
+        # once instead of re-reading dialog_options when building factory options.
+        self._cid_factory_template = (dialog_options.bot_id, dialog_options.skill)
+        # Likewise, the leading post_activity arguments are invariant; cache them as a
+        # tuple so each call is a single unpack instead of four dotted lookups. Nothing
+        # validates that a skill is configured before the first send, so when it is
+        # absent the prefix stays None and _send_to_skill raises explicitly before any
+        # state is saved or anything is posted to the skill client.
+        skill = dialog_options.skill
+        self._post_args_prefix = (
+            (
+                dialog_options.bot_id,
+                skill.app_id,
+                skill.skill_endpoint,
+                dialog_options.skill_host_endpoint,
+            )
+            if skill
+            else None
+        )
 
     async def begin_dialog(self, dialog_context: DialogContext, options: object = None):
         """
@@ -47,24 +186,22 @@ class SkillDialog(Dialog):
         :param dialog_context: The dialog context for the current turn of conversation.
         :param options: (Optional) additional argument(s) to pass to the dialog being started.
         """
-        dialog_args = self._validate_begin_dialog_args(options)
+        dialog_args = _validate_begin_dialog_args(options)
 
-        # Create deep clone of the original activity to avoid altering it before forwarding it.
-        skill_activity: Activity = deepcopy(dialog_args.activity)
+        # Create a clone of the original activity to avoid altering it before forwarding it.
+        skill_activity: Activity = self._clone_activity(dialog_args.activity)
 
         # Apply conversation reference and common properties from incoming activity before sending.
-        TurnContext.apply_conversation_reference(
-            skill_activity,
-            TurnContext.get_conversation_reference(dialog_context.context.activity),
-            is_incoming=True,
-        )
+        _apply_incoming_ref(skill_activity, dialog_context.context)
 
         # Store delivery mode in dialog state for later use.
-        dialog_context.active_dialog.state[self._deliver_mode_state_key] = (
+        dialog_context.active_dialog.state[self._DELIVER_MODE_KEY] = (
             dialog_args.activity.delivery_mode
         )
 
-        # Create the conversationId and store it in the dialog context state so we can use it later
+        # Create the conversationId and store it in the dialog context state so we can use it later.
+        # This must complete before _send_to_skill saves state, since the id is persisted as part
+        # of the dialog state the skill may read back mid-turn; the two awaits cannot overlap.
         skill_conversation_id = await self._create_skill_conversation_id(
             dialog_context.context, dialog_context.context.activity
         )
@@ -87,22 +224,19 @@ class SkillDialog(Dialog):
 
         # Handle EndOfConversation from the skill (this will be sent to the this dialog by the SkillHandler if
         # received from the Skill)
-        if dialog_context.context.activity.type == ActivityTypes.end_of_conversation:
+        if dialog_context.context.activity.type == _EOC:
             return await dialog_context.end_dialog(
                 dialog_context.context.activity.value
             )
 
-        # Create deep clone of the original activity to avoid altering it before forwarding it.
-        skill_activity = deepcopy(dialog_context.context.activity)
+        # Create a clone of the original activity to avoid altering it before forwarding it.
+        skill_activity = self._clone_activity(dialog_context.context.activity)
 
-        skill_activity.delivery_mode = dialog_context.active_dialog.state[
-            self._deliver_mode_state_key
-        ]
+        state = dialog_context.active_dialog.state
+        skill_activity.delivery_mode = state[self._DELIVER_MODE_KEY]
 
         # Just forward to the remote skill
-        skill_conversation_id = dialog_context.active_dialog.state[
-            SkillDialog.SKILLCONVERSATIONIDSTATEKEY
-        ]
+        skill_conversation_id = state[SkillDialog.SKILLCONVERSATIONIDSTATEKEY]
         eoc_activity = await self._send_to_skill(
             dialog_context.context, skill_activity, skill_conversation_id
         )
@@ -120,11 +254,7 @@ class SkillDialog(Dialog):
         )
 
         # Apply conversation reference and common properties from incoming activity before sending.
-        TurnContext.apply_conversation_reference(
-            reprompt_event,
-            TurnContext.get_conversation_reference(context.activity),
-            is_incoming=True,
-        )
+        _apply_incoming_ref(reprompt_event, context)
 
         # connection Name is not applicable for a RePrompt, as we don't expect as OAuthCard in response.
         skill_conversation_id = instance.state[SkillDialog.SKILLCONVERSATIONIDSTATEKEY]
@@ -144,11 +274,7 @@ class SkillDialog(Dialog):
             activity = Activity(type=ActivityTypes.end_of_conversation)
 
             # Apply conversation reference and common properties from incoming activity before sending.
-            TurnContext.apply_conversation_reference(
-                activity,
-                TurnContext.get_conversation_reference(context.activity),
-                is_incoming=True,
-            )
+            _apply_incoming_ref(activity, context)
             activity.channel_data = context.activity.channel_data
             activity.additional_properties = context.activity.additional_properties
 
@@ -160,23 +286,30 @@ class SkillDialog(Dialog):
 
         await super().end_dialog(context, instance, reason)
 
-    def _validate_begin_dialog_args(self, options: object) -> BeginSkillDialogOptions:
-        if not options:
-            raise TypeError("options cannot be None.")
-
-        dialog_args = BeginSkillDialogOptions.from_object(options)
-
-        if not dialog_args:
-            raise TypeError(
-                "SkillDialog: options object not valid as BeginSkillDialogOptions."
-            )
-
-        if not dialog_args.activity:
-            raise TypeError(
-                "SkillDialog: activity object in options as BeginSkillDialogOptions cannot be None."
-            )
+    def _clone_activity(self, activity: Activity) -> Activity:
+        """
+        Clones an activity before it is mutated and forwarded to the skill.
 
-        return dialog_args
+        Only top-level fields (delivery_mode and the conversation reference properties) are
+        reassigned before forwarding, so a shallow copy plus snapshots of the two objects
+        the skill client mutates in place is sufficient and avoids the cost of recursively
+        copying the whole activity graph. Construct the dialog with use_deep_copy=True to
+        restore the previous deep copy behavior.
+        """
+        if self._use_deep_copy:
+            return _fast_activity_deepcopy(activity)
+
+        clone = copy(activity)
+        # BotFrameworkHttpClient.post_activity rewrites conversation.id and recipient.role
+        # in place while the call is in flight, so the clone must not share those two
+        # objects with the caller's activity. begin_dialog would be safe without this
+        # because _apply_incoming_ref rebinds both, but continue_dialog forwards them
+        # exactly as received.
+        if clone.conversation:
+            clone.conversation = copy(clone.conversation)
+        if clone.recipient:
+            clone.recipient = copy(clone.recipient)
+        return clone
 
     def _on_validate_activity(
         self, activity: Activity  # pylint: disable=unused-argument
@@ -193,43 +326,60 @@ class SkillDialog(Dialog):
     async def _send_to_skill(
         self, context: TurnContext, activity: Activity, skill_conversation_id: str
     ) -> Activity:
+        if self._post_args_prefix is None:
+            raise TypeError("SkillDialog: dialog_options.skill cannot be None.")
+
         if activity.type == ActivityTypes.invoke:
             # Force ExpectReplies for invoke activities so we can get the replies right away and send
             # them back to the channel if needed. This makes sure that the dialog will receive the Invoke
             # response from the skill and any other activities sent, including EoC.
-            activity.delivery_mode = DeliveryModes.expect_replies
+            activity.delivery_mode = _EXPECT_REPLIES
 
         # Always save state before forwarding
         # (the dialog stack won't get updated with the skillDialog and things won't work if you don't)
         await self.dialog_options.conversation_state.save_changes(context, True)
 
-        skill_info = self.dialog_options.skill
         response = await self.dialog_options.skill_client.post_activity(
-            self.dialog_options.bot_id,
-            skill_info.app_id,
-            skill_info.skill_endpoint,
-            self.dialog_options.skill_host_endpoint,
+            *self._post_args_prefix,
             skill_conversation_id,
             activity,
         )
 
         # Inspect the skill response status
-        if not 200 <= response.status <= 299:
+        if response.status // 100 != 2:
+            skill_info = self.dialog_options.skill
             raise Exception(
                 f'Error invoking the skill id: "{skill_info.id}" at "{skill_info.skill_endpoint}"'
                 f" (status is {response.status}). \r\n {response.body}"
             )
 
         eoc_activity: Activity = None
-        if activity.delivery_mode == DeliveryModes.expect_replies and response.body:
+        if activity.delivery_mode == _EXPECT_REPLIES and response.body:
             # Process replies in the response.Body.
             response.body: List[Activity]
-            response.body = ExpectedReplies().deserialize(response.body).activities
+            if isinstance(response.body, dict):
+                # Deserialize the activities directly rather than going through the
+                # ExpectedReplies wrapper model, which would validate and allocate the
+                # wrapper only to discard it.
+                response.body = [
+                    Activity().deserialize(activity)
+                    for activity in response.body.get("activities") or []
+                ]
+            else:
+                response.body = ExpectedReplies().deserialize(response.body).activities
             # Track sent invoke responses, so more than one is not sent.
             sent_invoke_response = False
+            # Collect the replies bound for the channel so they go out in a single
+            # send_activities call instead of one await per reply.
+            activities_to_send = []
+            # Token exchange is only possible when a connection name is configured and
+            # the adapter supports it; evaluate once instead of per reply.
+            can_intercept = bool(self.dialog_options.connection_name) and isinstance(
+                context.adapter, ExtendedUserTokenProvider
+            )
 
             for from_skill_activity in response.body:
-                if from_skill_activity.type == ActivityTypes.end_of_conversation:
+                if from_skill_activity.type == _EOC:
                     # Capture the EndOfConversation activity if it was sent from skill
                     eoc_activity = from_skill_activity
 
@@ -237,20 +387,34 @@ class SkillDialog(Dialog):
                     await self.dialog_options.conversation_id_factory.delete_conversation_reference(
                         skill_conversation_id
                     )
-                elif not sent_invoke_response and await self._intercept_oauth_cards(
-                    context, from_skill_activity, self.dialog_options.connection_name
+
+                    # The dialog is over and no OAuth card can be intercepted, so the
+                    # remaining replies have no effect and need not be processed.
+                    if not can_intercept:
+                        break
+                elif (
+                    can_intercept
+                    and not sent_invoke_response
+                    and await self._intercept_oauth_cards(
+                        context,
+                        from_skill_activity,
+                        self.dialog_options.connection_name,
+                    )
                 ):
                     # Token exchange succeeded, so no oauthcard needs to be shown to the user
                     sent_invoke_response = True
                 else:
                     # If an invoke response has already been sent we should ignore future invoke responses as this
                     # represents a bug in the skill.
-                    if from_skill_activity.type == ActivityTypes.invoke_response:
+                    if from_skill_activity.type == _INVOKE_RESPONSE:
                         if sent_invoke_response:
                             continue
                         sent_invoke_response = True
-                    # Send the response back to the channel.
-                    await context.send_activity(from_skill_activity)
+                    # Queue the response to be sent back to the channel.
+                    activities_to_send.append(from_skill_activity)
+
+            if activities_to_send:
+                await context.send_activities(activities_to_send)
 
         return eoc_activity
 
@@ -258,11 +422,12 @@ class SkillDialog(Dialog):
         self, context: TurnContext, activity: Activity
     ) -> str:
         # Create a conversationId to interact with the skill and send the activity
+        from_bot_id, bot_framework_skill = self._cid_factory_template
         conversation_id_factory_options = SkillConversationIdFactoryOptions(
             from_bot_oauth_scope=context.turn_state.get(BotAdapter.BOT_OAUTH_SCOPE_KEY),
-            from_bot_id=self.dialog_options.bot_id,
+            from_bot_id=from_bot_id,
             activity=activity,
-            bot_framework_skill=self.dialog_options.skill,
+            bot_framework_skill=bot_framework_skill,
         )
         skill_conversation_id = await self.dialog_options.conversation_id_factory.create_skill_conversation_id(
             conversation_id_factory_options
@@ -274,18 +439,21 @@ class SkillDialog(Dialog):
     ):
         """
         Tells is if we should intercept the OAuthCard message.
+
+        The caller is expected to have verified that a connection name is configured and
+        that the adapter supports token exchange (ExtendedUserTokenProvider); when it does
+        not, we fall back to showing an oauth card to the user.
         """
-        if not connection_name or not isinstance(
-            context.adapter, ExtendedUserTokenProvider
-        ):
-            # The adapter may choose not to support token exchange, in which case we fallback to
-            # showing an oauth card to the user.
+        if not activity.attachments:
             return False
 
         oauth_card_attachment = next(
-            attachment
-            for attachment in activity.attachments
-            if attachment.content_type == ContentTypes.oauth_card
+            (
+                attachment
+                for attachment in activity.attachments
+                if attachment.content_type == _OAUTH_CT
+            ),
+            None,
         )
         if oauth_card_attachment:
             oauth_card = oauth_card_attachment.content
@@ -313,7 +481,7 @@ class SkillDialog(Dialog):
                             oauth_card.connection_name,
                             result.token,
                         )
-                except:
+                except Exception:  # pylint: disable=broad-except
                     # Failures in token exchange are not fatal. They simply mean that the user needs
                     # to be shown the OAuth card.
                     return False
@@ -327,22 +495,30 @@ class SkillDialog(Dialog):
         connection_name: str,
         token: str,
     ):
-        activity = incoming_activity.create_reply()
-        activity.type = ActivityTypes.invoke
-        activity.name = SignInConstants.token_exchange_operation_name
-        activity.value = TokenExchangeInvokeRequest(
-            id=request_id,
-            token=token,
-            connection_name=connection_name,
+        # Build the invoke directly rather than through create_reply, which copies
+        # routing fields the invoke does not need and allocates a throwaway message.
+        # The accounts and conversation are shallow-copied because the skill client
+        # mutates them in place while posting (see _clone_activity), and on a failed
+        # exchange the incoming OAuth-card activity is forwarded to the user afterwards.
+        activity = Activity(
+            type=ActivityTypes.invoke,
+            name=SignInConstants.token_exchange_operation_name,
+            value=TokenExchangeInvokeRequest(
+                id=request_id,
+                token=token,
+                connection_name=connection_name,
+            ),
+            conversation=copy(incoming_activity.conversation),
+            service_url=incoming_activity.service_url,
+            channel_id=incoming_activity.channel_id,
+            from_property=copy(incoming_activity.recipient),
+            recipient=copy(incoming_activity.from_property),
+            reply_to_id=incoming_activity.id,
         )
 
         # route the activity to the skill
-        skill_info = self.dialog_options.skill
         response = await self.dialog_options.skill_client.post_activity(
-            self.dialog_options.bot_id,
-            skill_info.app_id,
-            skill_info.skill_endpoint,
-            self.dialog_options.skill_host_endpoint,
+            *self._post_args_prefix,
             incoming_activity.conversation.id,
             activity,
         )
@@ -306,6 +306,34 @@ class SkillDialogTests(aiounittest.AsyncTestCase):
         with self.assertRaises(Exception):
             await client.send_activity("irrelevant")
 
+    async def test_should_throw_on_missing_skill(self):
+        mock_skill_client = self._create_mock_skill_client(None)
+
+        conversation_state = ConversationState(MemoryStorage())
+        # Options without a skill: the dialog can be constructed, but sending must
+        # fail fast before anything reaches the skill client.
+        dialog_options = SkillDialogOptions(
+            bot_id=str(uuid.uuid4()),
+            skill_host_endpoint="http://test.contoso.com/skill/messages",
+            conversation_id_factory=SimpleConversationIdFactory(),
+            conversation_state=conversation_state,
+            skill_client=mock_skill_client,
+        )
+
+        sut = SkillDialog(dialog_options, "dialog_id")
+        activity_to_send = MessageFactory.text(str(uuid.uuid4()))
+
+        client = DialogTestClient(
+            "test",
+            sut,
+            BeginSkillDialogOptions(activity=activity_to_send),
+            conversation_state=conversation_state,
+        )
+
+        with self.assertRaises(TypeError):
+            await client.send_activity("irrelevant")
+        mock_skill_client.post_activity.assert_not_called()
+
     async def test_should_intercept_oauth_cards_for_sso(self):
         connection_name = "connectionName"
         first_response = ExpectedReplies(
@@ -580,6 +608,242 @@ class SkillDialogTests(aiounittest.AsyncTestCase):
         self.assertEqual(0, len(simple_id_factory.conversation_refs))
         self.assertEqual(1, simple_id_factory.create_count)
 
+    async def test_expect_replies_sends_replies_in_single_batch(self):
+        expected_replies = [
+            MessageFactory.text("first reply"),
+            MessageFactory.text("second reply"),
+        ]
+        mock_skill_client = self._create_mock_skill_client(
+            None, expected_replies=expected_replies
+        )
+
+        conversation_state = ConversationState(MemoryStorage())
+        dialog_options = SkillDialogTests.create_skill_dialog_options(
+            conversation_state, mock_skill_client
+        )
+
+        sut = SkillDialog(dialog_options, dialog_id="dialog")
+        activity_to_send = SkillDialogTests.create_send_activity()
+
+        client = DialogTestClient(
+            "test",
+            sut,
+            BeginSkillDialogOptions(activity=activity_to_send),
+            conversation_state=conversation_state,
+        )
+
+        # Spy on TurnContext.send_activities to record how the replies are batched.
+        send_batches = []
+        original_send_activities = TurnContext.send_activities
+
+        async def record_batches(context, activities):
+            send_batches.append(list(activities))
+            return await original_send_activities(context, activities)
+
+        TurnContext.send_activities = record_batches
+        try:
+            first_reply = await client.send_activity(MessageFactory.text("irrelevant"))
+        finally:
+            TurnContext.send_activities = original_send_activities
+
+        # Both replies go to the adapter in one batch, in the order the skill sent them.
+        self.assertEqual(1, len(send_batches))
+        self.assertEqual(
+            ["first reply", "second reply"],
+            [activity.text for activity in send_batches[0]],
+        )
+        self.assertEqual("first reply", first_reply.text)
+        self.assertEqual("second reply", client.get_next_reply().text)
+
+    async def test_should_forward_replies_from_serialized_response_body(self):
+        # The HTTP skill client returns parsed JSON, so the body arrives as a dict in
+        # wire format rather than an ExpectedReplies model.
+        first_response = ExpectedReplies(
+            activities=[MessageFactory.text("dict body reply")]
+        ).serialize()
+
+        sequence = 0
+
+        async def post_return():
+            nonlocal sequence
+            if sequence == 0:
+                result = InvokeResponse(body=first_response, status=HTTPStatus.OK)
+            else:
+                result = InvokeResponse(status=HTTPStatus.OK)
+            sequence += 1
+            return result
+
+        mock_skill_client = self._create_mock_skill_client(None, post_return)
+        conversation_state = ConversationState(MemoryStorage())
+
+        dialog_options = SkillDialogTests.create_skill_dialog_options(
+            conversation_state, mock_skill_client
+        )
+        sut = SkillDialog(dialog_options, dialog_id="dialog")
+        activity_to_send = SkillDialogTests.create_send_activity()
+
+        client = DialogTestClient(
+            "test",
+            sut,
+            BeginSkillDialogOptions(activity=activity_to_send),
+            conversation_state=conversation_state,
+        )
+
+        final_activity = await client.send_activity(MessageFactory.text("irrelevant"))
+        self.assertIsNotNone(final_activity)
+        self.assertEqual("dict body reply", final_activity.text)
+        self.assertEqual(DialogTurnStatus.Waiting, client.dialog_turn_result.status)
+
+    async def test_should_handle_serialized_response_body_without_activities(self):
+        sequence = 0
+
+        async def post_return():
+            nonlocal sequence
+            if sequence == 0:
+                # A dict body without an activities key must not raise or forward anything.
+                result = InvokeResponse(body={"id": "123"}, status=HTTPStatus.OK)
+            else:
+                result = InvokeResponse(status=HTTPStatus.OK)
+            sequence += 1
+            return result
+
+        mock_skill_client = self._create_mock_skill_client(None, post_return)
+        conversation_state = ConversationState(MemoryStorage())
+
+        dialog_options = SkillDialogTests.create_skill_dialog_options(
+            conversation_state, mock_skill_client
+        )
+        sut = SkillDialog(dialog_options, dialog_id="dialog")
+        activity_to_send = SkillDialogTests.create_send_activity()
+
+        client = DialogTestClient(
+            "test",
+            sut,
+            BeginSkillDialogOptions(activity=activity_to_send),
+            conversation_state=conversation_state,
+        )
+
+        final_activity = await client.send_activity(MessageFactory.text("irrelevant"))
+        self.assertIsNone(final_activity)
+        self.assertEqual(DialogTurnStatus.Waiting, client.dialog_turn_result.status)
+
+    async def test_replies_after_eoc_dropped_when_interception_impossible(self):
+        expected_replies = [
+            MessageFactory.text("before eoc"),
+            Activity.create_end_of_conversation_activity(),
+            MessageFactory.text("after eoc"),
+        ]
+        mock_skill_client = self._create_mock_skill_client(
+            None, expected_replies=expected_replies
+        )
+
+        conversation_state = ConversationState(MemoryStorage())
+        # No connection name, so no OAuth card can be intercepted and the reply loop
+        # stops at the end-of-conversation activity.
+        dialog_options = SkillDialogTests.create_skill_dialog_options(
+            conversation_state, mock_skill_client
+        )
+
+        sut = SkillDialog(dialog_options, dialog_id="dialog")
+        activity_to_send = SkillDialogTests.create_send_activity()
+
+        client = DialogTestClient(
+            "test",
+            sut,
+            BeginSkillDialogOptions(activity=activity_to_send),
+            conversation_state=conversation_state,
+        )
+
+        first_reply = await client.send_activity(MessageFactory.text("irrelevant"))
+
+        self.assertEqual("before eoc", first_reply.text)
+        self.assertIsNone(client.get_next_reply())
+        self.assertEqual(DialogTurnStatus.Complete, client.dialog_turn_result.status)
+
+    async def test_replies_after_eoc_processed_when_interception_possible(self):
+        expected_replies = [
+            MessageFactory.text("before eoc"),
+            Activity.create_end_of_conversation_activity(),
+            MessageFactory.text("after eoc"),
+        ]
+        mock_skill_client = self._create_mock_skill_client(
+            None, expected_replies=expected_replies
+        )
+
+        conversation_state = ConversationState(MemoryStorage())
+        # With a connection name the adapter supports token exchange, so every reply
+        # after the end-of-conversation activity must still be scanned and forwarded.
+        dialog_options = SkillDialogTests.create_skill_dialog_options(
+            conversation_state, mock_skill_client, "connectionName"
+        )
+
+        sut = SkillDialog(dialog_options, dialog_id="dialog")
+        activity_to_send = SkillDialogTests.create_send_activity()
+
+        client = DialogTestClient(
+            "test",
+            sut,
+            BeginSkillDialogOptions(activity=activity_to_send),
+            conversation_state=conversation_state,
+        )
+
+        first_reply = await client.send_activity(MessageFactory.text("irrelevant"))
+
+        self.assertEqual("before eoc", first_reply.text)
+        self.assertEqual("after eoc", client.get_next_reply().text)
+        self.assertEqual(DialogTurnStatus.Complete, client.dialog_turn_result.status)
+
+    async def test_begin_dialog_deep_copy_isolates_nested_objects(self):
+        activity_sent: Activity = None
+
+        async def capture(
+            from_bot_id: str,  # pylint: disable=unused-argument
+            to_bot_id: str,  # pylint: disable=unused-argument
+            to_url: str,  # pylint: disable=unused-argument
+            service_url: str,  # pylint: disable=unused-argument
+            conversation_id: str,  # pylint: disable=unused-argument
+            activity: Activity,
+        ):
+            nonlocal activity_sent
+            activity_sent = activity
+
+        mock_skill_client = self._create_mock_skill_client(capture)
+
+        conversation_state = ConversationState(MemoryStorage())
+        dialog_options = SkillDialogTests.create_skill_dialog_options(
+            conversation_state, mock_skill_client
+        )
+
+        sut = SkillDialog(dialog_options, "dialog_id", use_deep_copy=True)
+        activity_to_send = MessageFactory.attachment(
+            Attachment(content_type="application/json", content={"payload": [1, 2]})
+        )
+        activity_to_send.channel_data = {"tenant": {"id": str(uuid.uuid4())}}
+
+        client = DialogTestClient(
+            "test",
+            sut,
+            BeginSkillDialogOptions(activity=activity_to_send),
+            conversation_state=conversation_state,
+        )
+
+        # Send something to the dialog to start it
+        await client.send_activity(MessageFactory.text("irrelevant"))
+
+        # The forwarded activity must be a deep copy: equal nested data, distinct objects.
+        assert activity_sent is not activity_to_send
+        assert activity_sent.attachments[0] is not activity_to_send.attachments[0]
+        assert (
+            activity_sent.attachments[0].content
+            == activity_to_send.attachments[0].content
+        )
+        assert (
+            activity_sent.attachments[0].content
+            is not activity_to_send.attachments[0].content
+        )
+        assert activity_sent.channel_data == activity_to_send.channel_data
+        assert activity_sent.channel_data is not activity_to_send.channel_data
+
     @staticmethod
     def create_skill_dialog_options(
         conversation_state: ConversationState,